@@ -1,17 +1,21 @@
-from collections import Counter, defaultdict
+from bisect import bisect_left, bisect_right
+from collections import Counter, defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
 from tqdm import tqdm
 import igraph as ig
+import numpy as np
 import pandas as pd
+import re
+import zlib
 
+from utils import temporal_snapshots
 
-def get_coaction_dict(tweets: list[dict], s: int = 1, s_lower: int = 10000):
-    url_index = defaultdict(list)
-    for tweet in tweets:
-        for url in tweet.get("urls", []):
-            url_index[url].append((tweet["ts"], tweet["account_id"]))
+
+def _count_windowed_pairs(index: dict, s: int = 1) -> dict:
+    """Count account pairs acting on the same key within `s` seconds."""
     edges = {}
-    # Process each URL separately
-    for url, entries in tqdm(url_index.items()):
+    # Process each key separately
+    for key, entries in tqdm(index.items()):
         # Sort by timestamp to allow sliding window
         entries.sort()  # sorts by timestamp automatically
         # Sliding window over sorted timestamps
@@ -30,6 +34,273 @@ def get_coaction_dict(tweets: list[dict], s: int = 1, s_lower: int = 10000):
     return edges
 
 
+def get_coaction_dict(tweets: list[dict], s: int = 1, s_lower: int = 10000):
+    url_index = defaultdict(list)
+    for tweet in tweets:
+        for url in tweet.get("urls", []):
+            url_index[url].append((tweet["ts"], tweet["account_id"]))
+    return _count_windowed_pairs(url_index, s)
+
+
+def get_media_coaction_dict(tweets: list[dict], s: int = 1, media_ids: set | None = None):
+    """
+    Count account pairs posting the same media within `s` seconds.
+
+    Parameters
+    ----------
+    tweets : list[dict]
+        Tweets as returned by `load_tweets_jsonl`, with a "media" list of
+        media keys.
+    s : int, optional
+        Maximum time difference (seconds) between two co-actions.
+    media_ids : set, optional
+        If given (e.g. from `utils.load_media_list`), only media keys in this
+        set are considered.
+
+    Returns
+    -------
+    dict
+        ``{(acc1, acc2): count}``, the same format as `get_coaction_dict`.
+    """
+    media_index = defaultdict(list)
+    for tweet in tweets:
+        for media_id in tweet.get("media", []):
+            if media_ids is None or media_id in media_ids:
+                media_index[media_id].append((tweet["ts"], tweet["account_id"]))
+    return _count_windowed_pairs(media_index, s)
+
+
+# prime modulus of the MinHash permutations (2^31 - 1), small enough that
+# a * x + b never overflows 64 bits
+_MINHASH_PRIME = (1 << 31) - 1
+
+
+def _normalise_text(text: str) -> str:
+    text = re.sub(r"https?://\S+|@\w+", " ", text.lower())
+    return " ".join(text.split())
+
+
+def _minhash_chunk(texts: list[str], num_perm: int, k: int, seed: int) -> np.ndarray:
+    """MinHash signatures (len(texts) x num_perm) of character k-shingles."""
+    # regenerated from the seed so every worker uses the same permutations
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, _MINHASH_PRIME, size=(num_perm, 1), dtype=np.int64)
+    b = rng.integers(0, _MINHASH_PRIME, size=(num_perm, 1), dtype=np.int64)
+    # values are below 2^31, so int32 halves the signature memory
+    signatures = np.full((len(texts), num_perm), _MINHASH_PRIME, dtype=np.int32)
+    for i, text in enumerate(texts):
+        shingles = {text[j:j + k] for j in range(len(text) - k + 1)}
+        if not shingles:
+            continue
+        # crc32 instead of hash(), which is salted per process
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode()) for shingle in shingles),
+            dtype=np.int64,
+            count=len(shingles),
+        ) % _MINHASH_PRIME
+        signatures[i] = ((a * hashes + b) % _MINHASH_PRIME).min(axis=1)
+    return signatures
+
+
+def _count_cross_pairs(entries_a: list, entries_b: list, s: int, edges: dict) -> None:
+    """Count pairs of (ts, account) entries from two sorted lists within `s` seconds."""
+    if len(entries_a) > len(entries_b):
+        entries_a, entries_b = entries_b, entries_a
+    times_b = [t for t, _ in entries_b]
+    for entry in entries_a:
+        lo = bisect_left(times_b, entry[0] - s)
+        hi = bisect_right(times_b, entry[0] + s)
+        for other in entries_b[lo:hi]:
+            # same (earlier, later) orientation as `_count_windowed_pairs`
+            first, second = (entry, other) if entry <= other else (other, entry)
+            edges[(first[1], second[1])] = edges.get((first[1], second[1]), 0) + 1
+
+
+def get_text_coaction_dict(
+    tweets: list[dict],
+    s: int = 600,
+    k: int = 5,
+    bands: int = 16,
+    rows: int = 4,
+    threshold: float = 0.5,
+    min_length: int = 20,
+    skip_retweets: bool = True,
+    chunk_size: int = 20000,
+    workers: int | None = None,
+    seed: int = 0,
+):
+    """
+    Count account pairs posting near-identical text within `s` seconds.
+
+    Parameters
+    ----------
+    tweets : list[dict]
+        Tweets with a "text" key, e.g. from `load_tweets_jsonl(path, text=True)`.
+    s : int, optional
+        Maximum time difference (seconds) between two co-actions.
+    k : int, optional
+        Length of the character shingles.
+    bands, rows : int, optional
+        LSH banding of the ``bands * rows`` MinHash values. Texts sharing all
+        rows of at least one band become candidate pairs; the banding
+        threshold is roughly ``(1 / bands) ** (1 / rows)`` (0.5 by default).
+    threshold : float, optional
+        Minimum Jaccard similarity, estimated as the fraction of equal MinHash
+        values, for a candidate pair to be counted.
+    min_length : int, optional
+        Texts shorter than this (or than `k`) after normalisation are ignored.
+    skip_retweets : bool, optional
+        Ignore "RT @..." texts, which duplicate the original tweet verbatim.
+    chunk_size : int, optional
+        Number of texts per signature task.
+    workers : int, optional
+        Size of the process pool computing signatures.
+    seed : int, optional
+        Seed of the MinHash permutations.
+
+    Returns
+    -------
+    dict
+        ``{(acc1, acc2): count}``, the same format as `get_coaction_dict`.
+        Every pair of near-duplicate texts posted within `s` seconds counts
+        once; near-duplicates of near-duplicates are not chained together.
+    """
+    selected, texts = [], []
+    num_tweets, has_text = 0, False
+    for tweet in tweets:
+        num_tweets += 1
+        has_text = has_text or "text" in tweet
+        text = tweet.get("text") or ""
+        if skip_retweets and text.startswith("RT @"):
+            continue
+        text = _normalise_text(text)
+        # texts without a single k-shingle would all share one signature
+        if len(text) < max(min_length, k):
+            continue
+        selected.append((tweet["ts"], tweet["account_id"]))
+        texts.append(text)
+    # a table without texts would otherwise look like "no coordination found"
+    if num_tweets and not has_text:
+        raise ValueError('tweets carry no "text"; load them with load_tweets_jsonl(path, text=True)')
+
+    num_perm = bands * rows
+    chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+    if len(chunks) <= 1 or workers == 1:
+        signatures = [_minhash_chunk(chunk, num_perm, k, seed) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(
+                _minhash_chunk,
+                chunks,
+                [num_perm] * len(chunks),
+                [k] * len(chunks),
+                [seed] * len(chunks),
+            )
+            signatures = [signature for signature in tqdm(results, total=len(chunks))]
+    if not signatures:
+        return {}
+    signatures = np.concatenate(signatures)
+
+    # collapse texts with identical signatures; pairs inside such a group are
+    # always verified and are counted like tweets sharing a URL
+    unique_signatures, inverse = np.unique(signatures, axis=0, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    groups = [[] for _ in range(len(unique_signatures))]
+    for i, code in enumerate(inverse.tolist()):
+        groups[code].append(selected[i])
+    for entries in groups:
+        entries.sort()
+    t_min = np.array([entries[0][0] for entries in groups], dtype=np.int64)
+    t_max = np.array([entries[-1][0] for entries in groups], dtype=np.int64)
+    edges = _count_windowed_pairs(
+        {code: entries for code, entries in enumerate(groups) if len(entries) > 1}, s
+    )
+
+    # distinct signatures sharing a bucket are candidate pairs; each is
+    # verified on its full signature in the first band where it collides, so
+    # it is counted once and similarity is never chained transitively
+    for band in tqdm(range(bands)):
+        buckets = defaultdict(list)
+        band_signatures = np.ascontiguousarray(
+            unique_signatures[:, band * rows:(band + 1) * rows]
+        )
+        for code, row in enumerate(band_signatures):
+            buckets[row.tobytes()].append(code)
+        for members in buckets.values():
+            if len(members) < 2:
+                continue
+            members = np.array(members)
+            members = members[np.argsort(t_min[members], kind="stable")]
+            for idx in range(1, len(members)):
+                code = members[idx]
+                # earlier groups start before this one; keep those still in reach
+                candidates = members[:idx]
+                candidates = candidates[t_max[candidates] >= t_min[code] - s]
+                if len(candidates) == 0:
+                    continue
+                equal = unique_signatures[candidates] == unique_signatures[code]
+                first_band = equal.reshape(len(candidates), bands, rows).all(axis=2).argmax(axis=1)
+                verified = (first_band == band) & (equal.mean(axis=1) >= threshold)
+                for other in candidates[verified].tolist():
+                    _count_cross_pairs(groups[other], groups[code], s, edges)
+
+    return edges
+
+
+def _coaction_events(tweets: list[dict], s: int = 1):
+    """Yield (ts, acc1, acc2) for every URL co-action, in chronological order."""
+    # per URL, the (ts, account) entries of the last `s` seconds
+    recent = defaultdict(deque)
+    for tweet in sorted(tweets, key=lambda t: (t["ts"], t["account_id"])):
+        t2, acc2 = tweet["ts"], tweet["account_id"]
+        for url in tweet.get("urls", []):
+            entries = recent[url]
+            while entries and t2 - entries[0][0] > s:
+                entries.popleft()
+            for _, acc1 in entries:
+                yield t2, acc1, acc2
+            entries.append((t2, acc2))
+
+
+def get_temporal_coaction_snapshots(
+    tweets: list[dict], s: int = 1, window="day", step=None
+):
+    """
+    Time-sliced version of `get_coaction_dict`.
+
+    Parameters
+    ----------
+    tweets : list[dict]
+        Tweets as returned by `load_tweets_jsonl`.
+    s : int, optional
+        Maximum time difference (seconds) between two co-actions.
+    window : int or str, optional
+        Snapshot length in seconds, or "hour", "day", "week".
+    step : int or str, optional
+        Offset between snapshot starts. Defaults to `window` (tumbling);
+        a smaller step gives sliding windows.
+
+    Returns
+    -------
+    generator of dict
+        Snapshots as produced by `utils.temporal_snapshots`. A co-action is
+        assigned to the window containing the later of its two tweets.
+    """
+    return temporal_snapshots(_coaction_events(tweets, s), window, step)
+
+
+def get_graph_from_snapshot(snapshot: dict, r: int = 5) -> ig.Graph:
+    keep = (snapshot["sources"] != snapshot["targets"]) & (snapshot["weights"] >= r)
+    graph_edges = zip(
+        snapshot["sources"][keep].tolist(),
+        snapshot["targets"][keep].tolist(),
+        snapshot["weights"][keep].tolist(),
+    )
+    return ig.Graph.TupleList(
+        graph_edges, vertex_name_attr="account_id", edge_attrs=["weight"]
+    )
+
+
 def get_graph_from_coaction_dict(edges, r: int = 5) -> ig.Graph:
     graph_edges = []
     for key, value in edges.items():
@@ -20,12 +20,16 @@ to process only the first N tweet lines (otherwise the full dataset is used).
 import igraph as ig
 import matplotlib.pyplot as plt
 import argparse
+from datetime import datetime, timezone
 
 # faster than standard json package
+import numpy as np
 import orjson
 import pandas as pd
 from tqdm import tqdm
 
+from utils import temporal_snapshots, save_snapshots
+
 
 def process_tweets(
     tweets: str = "./data/tweets.dat",
@@ -58,6 +62,7 @@ def process_tweets(
         - timestamp (ISO-8601, truncated to seconds)
         - author metadata
         - expanded URLs (if present)
+        - media keys (if present)
     3. Writes simplified tweets into a `.jsonl` file in JSONL format.
     ------------
     Writes files to disk:
@@ -89,7 +94,7 @@ def process_tweets(
             }
             if row.get("attachments", None) is not None:
                 if row["attachments"].get("media_keys", None) is not None:
-                    tweet["media"] = row["attachments"]["media_keys"][0]
+                    tweet["media"] = row["attachments"]["media_keys"]
             author_id = int(row["author_id"])
             tweet["account"] = {"id": author_id}
             if author_id in author_meta:
@@ -115,13 +120,8 @@ def process_tweets(
             out_file.write("\n".join(buffer) + "\n")
 
 
-def create_networks(
-    tweets: str = "./data/tweets.dat",
-    sample: int = 2260916,
-) -> None:
-
-    retweet_edges = []
-    reply_edges = []
+def _iter_network_edges(tweets: str, sample: int):
+    """Yield (tweet_type, ts, edge) for every retweet/reply in the raw tweet file."""
     processed = 0
     with open(tweets, "r") as in_file:
         for line in tqdm(in_file, total=2260916):
@@ -131,7 +131,7 @@ def create_networks(
             row = orjson.loads(line)
             author_id = int(row["author_id"])
             refs = row.get("referenced_tweets")
-            if len(refs) != 1:
+            if not refs or len(refs) != 1:
                 continue
             tweet_type = refs[0]["type"]
             if tweet_type in ["retweeted", "replied_to"]:
@@ -149,10 +149,26 @@ def create_networks(
                     row["id"],
                     row["possibly_sensitive"],
                 )
-                if tweet_type == "retweeted":
-                    retweet_edges.append(edge)
-                else:
-                    reply_edges.append(edge)
+                ts = int(
+                    datetime.fromisoformat(row["created_at"][:19])
+                    .replace(tzinfo=timezone.utc)
+                    .timestamp()
+                )
+                yield tweet_type, ts, edge
+
+
+def create_networks(
+    tweets: str = "./data/tweets.dat",
+    sample: int = 2260916,
+) -> None:
+
+    retweet_edges = []
+    reply_edges = []
+    for tweet_type, _, edge in _iter_network_edges(tweets, sample):
+        if tweet_type == "retweeted":
+            retweet_edges.append(edge)
+        else:
+            reply_edges.append(edge)
 
     # create a reply & a retweet graph
     reply_graph = ig.Graph.TupleList(
@@ -171,6 +187,182 @@ def create_networks(
     retweet_graph.write_graphml(f"./sampled_data/{sample}_retweet.graphml")
 
 
+def _build_author_lookup(authors: str):
+    """Return author ids sorted for `searchsorted` and their categorical metadata."""
+    authors_df = pd.read_csv(authors, sep="\t").drop_duplicates("author_id", keep="last")
+    authors_df = authors_df.sort_values("author_id")
+    ids = authors_df["author_id"].to_numpy(dtype=np.int64)
+    meta = {
+        column: pd.Categorical(authors_df[column])
+        for column in ["Type", "Lang", "Stance"]
+    }
+    # unmatched endpoints are reported with an "Unknown" stance
+    if "Unknown" not in meta["Stance"].categories:
+        meta["Stance"] = meta["Stance"].add_categories("Unknown")
+    return ids, meta
+
+
+def _lookup_authors(ids: np.ndarray, meta: dict, accounts: np.ndarray) -> dict:
+    """Vectorized metadata lookup; unknown accounts get missing values."""
+    pos = np.searchsorted(ids, accounts)
+    pos[pos == len(ids)] = 0
+    found = ids[pos] == accounts
+    # IntegerArray keeps 64-bit ids exact (a float NaN column would not)
+    columns = {"account_id": pd.arrays.IntegerArray(accounts.copy(), ~found)}
+    for column, values in meta.items():
+        codes = np.where(found, values.codes[pos], -1)
+        columns[column] = pd.Categorical.from_codes(codes, dtype=values.dtype)
+    return columns
+
+
+def _enrich_edge_chunk(chunk: list, ids: np.ndarray, meta: dict) -> pd.DataFrame:
+    edge_types, sources, targets, sensitive = zip(*chunk) if chunk else ((),) * 4
+    sources = np.array(sources, dtype=np.int64)
+    targets = np.array(targets, dtype=np.int64)
+    src = _lookup_authors(ids, meta, sources)
+    tgt = _lookup_authors(ids, meta, targets)
+    return pd.DataFrame(
+        {
+            "source": sources,
+            "target": targets,
+            # explicit dtypes keep the Parquet schema of an empty chunk valid
+            "edge_type": pd.array(edge_types, dtype="string"),
+            "edge_possibly_sensitive": np.array(sensitive, dtype=bool),
+            "source_stance": src["Stance"].fillna("Unknown"),
+            "target_stance": tgt["Stance"].fillna("Unknown"),
+            "account_id": src["account_id"],
+            "account_type": src["Type"],
+            "Lang": src["Lang"],
+            "stance": src["Stance"],
+            "account_id_target": tgt["account_id"],
+            "account_type_target": tgt["Type"],
+            "Lang_target": tgt["Lang"],
+            "stance_target": tgt["Stance"],
+        }
+    )
+
+
+def export_enriched_edges(
+    tweets: str = "./data/tweets.dat",
+    authors: str = "./data/accounts.tsv",
+    output: str = "./edges_retweet_enriched.csv",
+    sample: int = 2260916,
+    edge_types: tuple = ("retweet",),
+    chunk_size: int = 500000,
+) -> None:
+    """
+    Stream retweet/reply edges into an enriched edge table.
+
+    Parameters
+    ----------
+    tweets : str, optional
+        Path to the newline-delimited JSON file containing tweet objects.
+    authors : str, optional
+        Path to the accounts metadata TSV.
+    output : str, optional
+        Output path; a `.parquet` suffix writes Parquet (requires pyarrow),
+        anything else writes CSV.
+    sample : int, optional
+        Maximum number of tweet lines to process.
+    edge_types : tuple, optional
+        Edge types to export, "retweet" and/or "reply".
+    chunk_size : int, optional
+        Number of edges enriched and written at a time.
+
+    Notes
+    -----
+    Edges are collected from the same tweets as `create_networks` and written
+    chunk by chunk, so memory depends on `chunk_size` rather than on the total
+    number of edges. Both endpoints are enriched with Type, Lang and Stance
+    through a `searchsorted` lookup on the sorted author ids.
+    """
+    ids, meta = _build_author_lookup(authors)
+    names = {"retweeted": "retweet", "replied_to": "reply"}
+
+    parquet_writer = None
+    header = True
+    # buffer to not enrich and write each edge individually
+    chunk = []
+
+    def flush():
+        nonlocal parquet_writer, header
+        df = _enrich_edge_chunk(chunk, ids, meta)
+        chunk.clear()
+        if output.endswith(".parquet"):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if parquet_writer is None:
+                parquet_writer = pq.ParquetWriter(output, table.schema)
+            parquet_writer.write_table(table)
+        else:
+            df.to_csv(output, mode="w" if header else "a", header=header, index=False)
+        header = False
+
+    try:
+        # replace any previous output, even if no edges match
+        flush()
+        for tweet_type, _, edge in _iter_network_edges(tweets, sample):
+            edge_type = names[tweet_type]
+            if edge_type not in edge_types:
+                continue
+            chunk.append((edge_type, edge[0], edge[1], edge[4]))
+            if len(chunk) >= chunk_size:
+                flush()
+        # add edges still remaining in chunk
+        if chunk:
+            flush()
+    finally:
+        if parquet_writer is not None:
+            parquet_writer.close()
+
+
+def create_temporal_networks(
+    tweets: str = "./data/tweets.dat",
+    sample: int = 2260916,
+    window="day",
+    step=None,
+) -> None:
+    """
+    Time-sliced version of `create_networks`.
+
+    Reads the tweets once, orders the reply/retweet edges by creation time
+    and sweeps them into per-window snapshots whose edge weight is the number
+    of replies/retweets from source to target inside the window.
+
+    Parameters
+    ----------
+    tweets : str, optional
+        Path to the newline-delimited JSON file containing tweet objects.
+    sample : int, optional
+        Maximum number of tweet lines to process.
+    window : int or str, optional
+        Snapshot length in seconds, or "hour", "day", "week".
+    step : int or str, optional
+        Offset between snapshot starts. Defaults to `window` (tumbling);
+        a smaller step gives sliding windows.
+
+    Notes
+    -----
+    Writes files to disk:
+        - ./sampled_data/<sample>_reply_<window>.npz (+ _summary.csv)
+        - ./sampled_data/<sample>_retweet_<window>.npz (+ _summary.csv)
+    """
+
+    events = {"retweeted": [], "replied_to": []}
+    for tweet_type, ts, edge in _iter_network_edges(tweets, sample):
+        events[tweet_type].append((ts, edge[0], edge[1]))
+
+    for tweet_type, name in [("replied_to", "reply"), ("retweeted", "retweet")]:
+        edges = events[tweet_type]
+        edges.sort()
+        save_snapshots(
+            temporal_snapshots(edges, window, step),
+            f"./sampled_data/{sample}_{name}_{window}",
+        )
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Process tweet dataset.")
     parser.add_argument(